@@ -5,7 +5,17 @@ This is a beginner-friendly example showing how to create LLM-powered agents
 that interact with each other using the ReAct reasoning framework.
 """
 
+import litellm
+from litellm.caching import Cache
 from mesa import Model
+from mesa.datacollection import DataCollector
+
+from mesa_llm.llm_agent import LLMAgent
+from mesa_llm.module_llm import ModuleLLM
+from mesa_llm.parallel_stepping import step_agents_parallel_sync
+from mesa_llm.reasoning.react import ReActOutput
+from mesa_llm.reasoning.react import ReActReasoning as ReAct
+
 """
 Simple in-file scheduler to avoid relying on `mesa.time.RandomActivation`,
 which may not be available in all installed Mesa versions. This scheduler
@@ -13,8 +23,18 @@ implements the small subset used by the example: `add()` and `step()` and
 exposes the `agents` list used by `DataCollector`.
 """
 
+# Methods an agent needs for SimpleScheduler.step_batched to batch its requests
+BATCHED_STEP_METHODS = (
+    "build_plan_request",
+    "build_tool_call_request",
+    "apply_tool_call_response",
+    "_plan_request_kwargs",
+)
+
 
 class SimpleScheduler:
+    __slots__ = ("agents", "model")
+
     def __init__(self, model):
         self.model = model
         self.agents = []
@@ -23,18 +43,115 @@ class SimpleScheduler:
         self.agents.append(agent)
 
     def step(self):
-        # iterate over a copy so agents can modify schedule safely
-        for agent in list(self.agents):
-            agent.step()
-from mesa.datacollection import DataCollector
-from mesa_llm.llm_agent import LLMAgent
-from mesa_llm.reasoning.react import ReActReasoning as ReAct
+        # iterate by index over the agents present at the start of the step, so
+        # agents can add to the schedule safely without copying the list
+        for i in range(len(self.agents)):
+            self.agents[i].step()
+
+    def step_batched(self):
+        """
+        Step all agents, sending their planning requests to the LLM as one batch.
+
+        Each agent only builds its planning request; the requests are then sent
+        together and every response is handed back to the agent that asked for
+        it. The requests turning the plans into tool calls are batched the same
+        way. Agents routed to different LLMs are batched separately and the
+        batches are sent one after another, so a step costs two LLM round-trips
+        per LLM in use, whatever the number of agents.
+
+        All agents plan from the state at the start of the step: an agent does
+        not see the messages sent by the other agents during the same step.
+        """
+        batched = []
+        for i in range(len(self.agents)):
+            agent = self.agents[i]
+            # agents that cannot build their requests are stepped normally
+            if all(hasattr(agent, name) for name in BATCHED_STEP_METHODS):
+                batched.append(agent)
+            else:
+                agent.step()
+
+        if not batched:
+            return
+
+        for agent in batched:
+            agent.pre_step()
+
+        # one batch per LLM the agents were routed to
+        batches = {}
+        for agent in batched:
+            request = agent.build_plan_request()
+            key = (agent.llm.llm_model, agent.llm.api_base)
+            batches.setdefault(key, []).append((agent, request))
+
+        for batch in batches.values():
+            agents = [agent for agent, _ in batch]
+            llm = agents[0].llm
+            plan_kwargs = agents[0]._plan_request_kwargs()
+
+            plan_responses = llm.batch_generate(
+                messages=[request for _, request in batch], **plan_kwargs
+            )
+
+            # the planned actions are turned into tool calls in a second batch
+            tool_call_requests = [
+                agent.build_tool_call_request(response)
+                for agent, response in zip(agents, plan_responses)
+            ]
+            tool_call_responses = llm.batch_generate(
+                messages=tool_call_requests,
+                tool_schema=plan_kwargs["tool_schema"],
+                tool_choice="required",
+            )
+
+            for agent, response in zip(agents, tool_call_responses):
+                agent.apply_tool_call_response(response)
+                agent.post_step()
+
+    def step_parallel(self):
+        """Step all agents concurrently by running their astep() coroutines together."""
+        # also works from within a running event loop (e.g. Jupyter or Solara)
+        step_agents_parallel_sync(self.agents)
+
+
+# Tools the agents are allowed to use
+SELECTED_TOOLS = ["speak_to"]
+
+# Conversation rules shared by every agent, sent once as part of the system prompt
+FIXED_CONVERSATION_RULES = (
+    "You are participating in a casual conversation. "
+    "If there are other agents nearby, try to engage in conversation. "
+    "Use the speak_to tool to communicate with them. "
+    "Be natural and stay true to your personality."
+)
+
+# Per-step prompt, sent after the agent's memory as the last user message
+TURN_PROMPT = "Continue the conversation."
+
+
+class ConversationReAct(ReAct):
+    """ReAct reasoning that reuses the agent's precomputed static system prompt."""
+
+    def get_react_system_prompt(self) -> str:
+        return self.agent._static_prefix
 
 
 class ConversationAgent(LLMAgent):
     """An agent that can converse with other agents using LLMs and ReAct reasoning."""
 
-    def __init__(self, model, reasoning, llm_model, personality, system_prompt):
+    # System prompt template, filled with the agent's unique_id {i} and personality {p}.
+    # The conversation instructions are in FIXED_CONVERSATION_RULES.
+    SYSTEM_PROMPT_TEMPLATE = "You are Agent {i} with the following personality: {p}."
+
+    def __init__(
+        self,
+        model,
+        reasoning,
+        llm_model,
+        personality,
+        small_llm_model=None,
+        stream=False,
+    ):
         """
         Initialize a conversation agent.
 
@@ -43,64 +160,169 @@ class ConversationAgent(LLMAgent):
             reasoning: The reasoning framework (ReAct)
             llm_model: The LLM model in format 'provider/model_name'
             personality: A description of the agent's personality
-            system_prompt: The system prompt for the agent
+            small_llm_model: Cheaper LLM model used for the opening turn, when
+                there is no conversation to follow yet. It gets its own LLM
+                module, so it may use another provider than llm_model.
+                Defaults to llm_model (no routing).
+            stream: Stream the planning response of step() and print it as it arrives
         """
         super().__init__(
             model=model,
             reasoning=reasoning,
             llm_model=llm_model,
-            system_prompt=system_prompt,
             internal_state=[personality],  # Store personality as internal state
+            step_prompt=TURN_PROMPT,
+        )
+
+        # System prompt tells the agent its role and personality. It is filled in
+        # here because the unique_id, which the speak_to tool and the agent's
+        # memory use to name agents, is only known once Agent.__init__ has run.
+        system_prompt = self.SYSTEM_PROMPT_TEMPLATE.format_map(
+            {"i": self.unique_id, "p": personality}
         )
+        self.system_prompt = system_prompt
+        self.llm.system_prompt = system_prompt
         self.personality = personality
         self.messages_sent = 0
+        self.stream = stream
+
+        # The small model gets its own LLM module, with its own API key check and
+        # API base, and the agent switches between the two for each step.
+        self._large_llm = self.llm
+        if small_llm_model and small_llm_model != llm_model:
+            self._small_llm = ModuleLLM(llm_model=small_llm_model)
+        else:
+            self._small_llm = self.llm
+
+        # Everything that does not change between steps is kept in one system
+        # message, built once, so it is byte-identical across steps. The parts
+        # shared by all agents come first, followed by the agent's own prompt.
+        # Prefix caching only pays off once this exceeds the provider's minimum
+        # cacheable length (e.g. 1024 tokens for OpenAI).
+        self._static_prefix = "\n".join(
+            [
+                ReAct.get_react_system_prompt(self.reasoning),
+                FIXED_CONVERSATION_RULES,
+                system_prompt,
+            ]
+        )
+
+    def _record_message(self):
+        """Count a message sent by this agent, both for the agent and the model."""
+        self.messages_sent += 1
+        self.model._total_messages += 1
+
+    def _select_llm(self) -> ModuleLLM:
+        """Pick the LLM for this step: small model for the opening turn."""
+        # the prompt length is no use here: from the second step on, the
+        # memory in the prompt makes every prompt long
+        if self.model.steps == 1:
+            return self._small_llm
+        return self._large_llm
+
+    def _prepare_plan_prompt(self) -> list[str]:
+        """Prepare this step's planning prompt and switch to the LLM selected for it."""
+        # For this simple example we don't rely on spatial observations;
+        # pass None so the agent will use its system/step prompts.
+        prompt_list = self.reasoning.prepare_plan_prompt(obs=None)
+
+        llm = self._select_llm()
+        llm.system_prompt = self.llm.system_prompt  # set by prepare_plan_prompt
+        self.llm = llm
+
+        return prompt_list
+
+    def _plan_request_kwargs(self) -> dict:
+        """Arguments of the ReAct planning request, besides the prompt."""
+        return {
+            "tool_schema": self.tool_manager.get_all_tools_schema(SELECTED_TOOLS),
+            "tool_choice": "none",
+            "response_format": ReActOutput,
+        }
 
     def step(self):
         """Execute one step of the agent."""
-        # For this simple example we don't rely on spatial observations;
-        # pass None to reasoning.plan so the agent will use its system/step prompts.
-        observation = None
-
-        # Create a prompt for the agent
-        prompt = (
-            "You are participating in a casual conversation. "
-            "If there are other agents nearby, try to engage in conversation. "
-            "Use the speak_to tool to communicate with them. "
-            "Be natural and stay true to your personality."
-        )
+        prompt_list = self._prepare_plan_prompt()
 
         # Use ReAct reasoning to generate a plan
-        plan = self.reasoning.plan(
-            prompt=prompt, obs=observation, selected_tools=["speak_to"]
-        )
+        if self.stream:
+            content = self._stream_plan_content(prompt_list)
+        else:
+            response = self.llm.generate(
+                prompt=prompt_list, **self._plan_request_kwargs()
+            )
+            content = response.choices[0].message.content
+        plan = self.reasoning.complete_plan(content, selected_tools=SELECTED_TOOLS)
 
         # Apply the plan (execute the tools)
         self.apply_plan(plan)
-        self.messages_sent += 1
+        self._record_message()
 
     async def astep(self):
         """Async version of step for parallel execution."""
-        observation = None
+        prompt_list = self._prepare_plan_prompt()
 
-        prompt = (
-            "You are participating in a casual conversation. "
-            "If there are other agents nearby, try to engage in conversation. "
-            "Use the speak_to tool to communicate with them. "
-            "Be natural and stay true to your personality."
+        response = await self.llm.agenerate(
+            prompt=prompt_list, **self._plan_request_kwargs()
         )
+        action = self.reasoning.record_plan(response.choices[0].message.content)
+        plan = await self.reasoning.aexecute_tool_call(action, SELECTED_TOOLS)
+
+        self.apply_plan(plan)
+        self._record_message()
 
-        plan = await self.reasoning.aplan(
-            prompt=prompt, obs=observation, selected_tools=["speak_to"]
+    def _stream_plan_content(self, prompt_list: list[str]) -> str:
+        """Stream the planning response, printing it as it arrives, and return its content."""
+        chunks = self.llm.generate(
+            prompt=prompt_list, stream=True, **self._plan_request_kwargs()
         )
 
-        self.apply_plan(plan)
-        self.messages_sent += 1
+        content = []
+        print(f"Agent {self.unique_id} plans: ", end="", flush=True)
+        for chunk in chunks:
+            delta = chunk.choices[0].delta.content or ""
+            print(delta, end="", flush=True)
+            content.append(delta)
+        print()
+
+        return "".join(content)
+
+    def build_plan_request(self) -> list[dict]:
+        """
+        Build the chat messages of this step's planning request without sending them.
+
+        Used by SimpleScheduler.step_batched to send the requests of all agents at once.
+        """
+        prompt_list = self._prepare_plan_prompt()
+        return self.llm.get_messages(prompt_list)
+
+    def build_tool_call_request(self, response) -> list[dict]:
+        """
+        Record the plan in the LLM response to build_plan_request() and build the
+        chat messages of the request that turns it into tool calls.
+        """
+        action = self.reasoning.record_plan(response.choices[0].message.content)
+        return self.reasoning.build_tool_call_request(action)
+
+    def apply_tool_call_response(self, response):
+        """Execute the tool calls in the LLM response to build_tool_call_request()."""
+        self.apply_plan(self.reasoning.complete_tool_call(response))
+        self._record_message()
 
 
 class ConversationModel(Model):
     """A model where agents converse with each other using ReAct reasoning."""
 
-    def __init__(self, n_agents: int = 3, llm_model: str = "openai/gpt-4o-mini", seed: int = None):
+    def __init__(
+        self,
+        n_agents: int = 3,
+        llm_model: str = "openai/gpt-4o-mini",
+        seed: int = None,
+        parallel_stepping: bool = False,
+        small_llm_model: str | None = None,
+        cache_dir: str | None = None,
+        stream: bool = False,
+    ):
         """
         Initialize the conversation model.
 
@@ -108,11 +330,36 @@ class ConversationModel(Model):
             n_agents: Number of agents to create
             llm_model: LLM model in format 'provider/model_name'
             seed: Random seed for reproducibility
+            parallel_stepping: Step the agents concurrently with asyncio instead of
+                batching their planning requests
+            small_llm_model: Cheaper LLM model used for the opening turn, e.g.
+                'openai/gpt-4o-mini'. Defaults to llm_model.
+            cache_dir: Directory of an on-disk LLM response cache (e.g. '.cache').
+                Identical requests are then answered from the cache, also across
+                runs, instead of calling the provider. Requires `diskcache`.
+            stream: Step the agents one after the other, streaming and printing
+                their plans as they are generated. Cannot be combined with
+                parallel_stepping.
         """
+        if parallel_stepping and stream:
+            raise ValueError(
+                "stream cannot be combined with parallel_stepping: the agents' "
+                "async steps do not stream their plans."
+            )
+
         super().__init__(seed=seed)
         self.num_agents = n_agents
+        self.parallel_stepping = parallel_stepping
+        self.stream = stream
         self.schedule = SimpleScheduler(self)
         self.llm_model = llm_model
+        self._total_messages = 0  # kept up to date by the agents
+
+        self._cache = None
+        if cache_dir is not None:
+            # litellm checks this cache before every completion call
+            self._cache = Cache(type="disk", disk_cache_dir=cache_dir)
+            litellm.cache = self._cache
 
         # Define personalities for agents
         personalities = [
@@ -125,33 +372,40 @@ class ConversationModel(Model):
         for i in range(self.num_agents):
             personality = personalities[i % len(personalities)]
 
-            # System prompt tells the agent their role and personality
-            system_prompt = (
-                f"You are Agent {i} with the following personality: {personality}. "
-                f"You are participating in a casual conversation. Be natural and conversational. "
-                f"Use the speak_to tool to communicate with other agents."
-            )
-
             agent = ConversationAgent(
                 model=self,
-                reasoning=ReAct,  # Using ReAct reasoning framework
+                reasoning=ConversationReAct,  # Using ReAct reasoning framework
                 llm_model=llm_model,
                 personality=personality,
-                system_prompt=system_prompt,
+                small_llm_model=small_llm_model,
+                stream=stream,
             )
             self.schedule.add(agent)
 
         # Set up data collection
         self.datacollector = DataCollector(
-            model_reporters={"Total Messages": self._count_total_messages},
-            agent_reporters={"Messages Sent": "messages_sent"},
+            model_reporters={"Total Messages": "_total_messages"},
+            agent_reporters={
+                "Messages Sent": "messages_sent",
+                "Personality": "personality",
+            },
         )
 
-    def _count_total_messages(self):
-        """Count total messages sent by all agents."""
-        return sum(agent.messages_sent for agent in self.schedule.agents)
-
     def step(self):
         """Execute one step of the model."""
-        self.schedule.step()
+        if self.parallel_stepping:
+            # Run the agents' async steps concurrently
+            self.schedule.step_parallel()
+        elif self.stream:
+            # Step the agents one by one so their streamed plans do not interleave
+            self.schedule.step()
+        else:
+            # Plan for all agents with a single batched LLM request
+            self.schedule.step_batched()
         self.datacollector.collect(self)
+
+    def close(self):
+        """Unset the LLM response cache once the simulation is done."""
+        # litellm.cache is process-global; don't let it outlive this model
+        if self._cache is not None and litellm.cache is self._cache:
+            litellm.cache = None
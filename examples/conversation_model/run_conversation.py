@@ -40,6 +40,7 @@ def main():
     for step_num in range(steps):
         print(f"\n--- Step {step_num + 1} ---")
         model.step()
+    model.close()
 
     print("\n=== Simulation Complete ===\n")
 
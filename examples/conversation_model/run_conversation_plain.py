@@ -38,6 +38,7 @@ def main():
     for step in range(1, 4):
         print(f"\n--- Step {step} ---\n")
         model.step()
+    model.close()
 
     print("\n" + "=" * 70)
     print("Simulation Complete")
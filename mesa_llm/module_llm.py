@@ -1,14 +1,20 @@
 import os
 
 from dotenv import load_dotenv
-from litellm import acompletion, completion, litellm
+from litellm import acompletion, batch_completion, completion, litellm
 from litellm.exceptions import (
     APIConnectionError,
     RateLimitError,
     Timeout,
 )
 from rich.console import Console
-from tenacity import AsyncRetrying, retry, retry_if_exception_type, wait_exponential
+from tenacity import (
+    AsyncRetrying,
+    Retrying,
+    retry,
+    retry_if_exception_type,
+    wait_exponential,
+)
 
 RETRYABLE_EXCEPTIONS = (
     APIConnectionError,
@@ -103,6 +109,7 @@ class ModuleLLM:
         tool_schema: list[dict] | None = None,
         tool_choice: str = "auto",
         response_format: dict | object | None = None,
+        stream: bool = False,
     ) -> str:
         """
         Generate a response from the LLM using litellm based on the prompt
@@ -112,9 +119,10 @@ class ModuleLLM:
             tool_schema: The schema of the tools to use
             tool_choice: The choice of tool to use
             response_format: The format of the response
+            stream: Whether to stream the response
 
         Returns:
-            The response from the LLM
+            The response from the LLM, or an iterator over its chunks if stream is True
         """
 
         messages = self.get_messages(prompt)
@@ -128,6 +136,7 @@ class ModuleLLM:
                 tools=tool_schema,
                 tool_choice=tool_choice if tool_schema else None,
                 response_format=response_format,
+                stream=stream,
             )
 
         # Otherwise, use the default API base
@@ -138,10 +147,70 @@ class ModuleLLM:
                 tools=tool_schema,
                 tool_choice=tool_choice if tool_schema else None,
                 response_format=response_format,
+                stream=stream,
             )
 
         return response
 
+    def batch_generate(
+        self,
+        messages: list[list[dict]],
+        tool_schema: list[dict] | None = None,
+        tool_choice: str = "auto",
+        response_format: dict | object | None = None,
+    ) -> list:
+        """
+        Generate responses for several conversations with a single batched litellm call
+
+        Requests that fail with a retryable error are retried on their own, without
+        resending the requests of the batch that already succeeded.
+
+        Args:
+            messages: One list of chat messages (as returned by get_messages) per conversation
+            tool_schema: The schema of the tools to use, shared by all conversations
+            tool_choice: The choice of tool to use
+            response_format: The format of the responses
+
+        Returns:
+            The responses from the LLM, in the same order as the messages
+        """
+        kwargs = {"api_base": self.api_base} if self.api_base else {}
+        responses = [None] * len(messages)
+        pending = list(range(len(messages)))
+
+        for attempt in Retrying(
+            wait=wait_exponential(multiplier=1, min=1, max=60),
+            retry=retry_if_exception_type(RETRYABLE_EXCEPTIONS),
+            reraise=True,
+        ):
+            with attempt:
+                results = batch_completion(
+                    model=self.llm_model,
+                    messages=[messages[i] for i in pending],
+                    tools=tool_schema,
+                    tool_choice=tool_choice if tool_schema else None,
+                    response_format=response_format,
+                    **kwargs,
+                )
+
+                # litellm returns failed requests in place of their response
+                failed = []
+                errors = []
+                for i, result in zip(pending, results):
+                    if isinstance(result, Exception):
+                        failed.append(i)
+                        errors.append(result)
+                    else:
+                        responses[i] = result
+                pending = failed
+
+                if errors:
+                    # raise a non-retryable error first, so it is not retried
+                    errors.sort(key=lambda e: isinstance(e, RETRYABLE_EXCEPTIONS))
+                    raise errors[0]
+
+        return responses
+
     async def agenerate(
         self,
         prompt: str | list[str],
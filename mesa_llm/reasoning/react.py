@@ -45,6 +45,50 @@ class ReActReasoning(Reasoning):
 
         return prompt_list
 
+    def prepare_plan_prompt(
+        self, obs: Observation, prompt: str | None = None
+    ) -> list[str]:
+        """
+        Prepare the (ReAct) planning prompt without sending it to the LLM.
+
+        The agent's LLM system prompt is set to the ReAct system prompt, so the prompt can either be
+        passed to llm.generate() or turned into chat messages with llm.get_messages() for batching.
+        """
+        self.agent.llm.system_prompt = self.get_react_system_prompt()
+        prompt_list = self.get_react_prompt(obs)
+
+        # If no prompt is provided, use the agent's default step prompt
+        if prompt is None:
+            if self.agent.step_prompt is not None:
+                prompt_list.append(self.agent.step_prompt)
+            else:
+                raise ValueError("No prompt provided and agent.step_prompt is None.")
+
+        return prompt_list
+
+    def record_plan(self, content: str) -> str:
+        """
+        Parse the raw content of a planning response, store it in memory and return the planned action.
+        """
+        formatted_response = json.loads(content)
+
+        self.agent.memory.add_to_memory(type="plan", content=formatted_response)
+
+        return formatted_response["action"]
+
+    def complete_plan(
+        self, content: str, selected_tools: list[str] | None = None
+    ) -> Plan:
+        """
+        Turn the raw content of a planning response into an executable plan.
+        """
+        action = self.record_plan(content)
+
+        # ---------------- execute the plan ----------------
+        react_plan = self.execute_tool_call(action, selected_tools)
+
+        return react_plan
+
     def plan(
         self,
         obs: Observation,
@@ -57,15 +101,7 @@ class ReActReasoning(Reasoning):
         """
 
         # ---------------- prepare the prompt ----------------
-        self.agent.llm.system_prompt = self.get_react_system_prompt()
-        prompt_list = self.get_react_prompt(obs)
-
-        # If no prompt is provided, use the agent's default step prompt
-        if prompt is None:
-            if self.agent.step_prompt is not None:
-                prompt_list.append(self.agent.step_prompt)
-            else:
-                raise ValueError("No prompt provided and agent.step_prompt is None.")
+        prompt_list = self.prepare_plan_prompt(obs, prompt)
 
         selected_tools_schema = self.agent.tool_manager.get_all_tools_schema(
             selected_tools
@@ -79,16 +115,7 @@ class ReActReasoning(Reasoning):
             response_format=ReActOutput,
         )
 
-        formatted_response = json.loads(rsp.choices[0].message.content)
-
-        self.agent.memory.add_to_memory(type="plan", content=formatted_response)
-
-        # ---------------- execute the plan ----------------
-        react_plan = self.execute_tool_call(
-            formatted_response["action"], selected_tools
-        )
-
-        return react_plan
+        return self.complete_plan(rsp.choices[0].message.content, selected_tools)
 
     async def aplan(
         self,
@@ -102,15 +129,7 @@ class ReActReasoning(Reasoning):
         """
 
         # ---------------- prepare the prompt ----------------
-        self.agent.llm.system_prompt = self.get_react_system_prompt()
-        prompt_list = self.get_react_prompt(obs)
-
-        # If no prompt is provided, use the agent's default step prompt
-        if prompt is None:
-            if self.agent.step_prompt is not None:
-                prompt_list.append(self.agent.step_prompt)
-            else:
-                raise ValueError("No prompt provided and agent.step_prompt is None.")
+        prompt_list = self.prepare_plan_prompt(obs, prompt)
 
         selected_tools_schema = self.agent.tool_manager.get_all_tools_schema(
             selected_tools
@@ -125,13 +144,9 @@ class ReActReasoning(Reasoning):
             response_format=ReActOutput,
         )
 
-        formatted_response = json.loads(rsp.choices[0].message.content)
-
-        self.agent.memory.add_to_memory(type="plan", content=formatted_response)
+        action = self.record_plan(rsp.choices[0].message.content)
 
         # ---------------- execute the plan ----------------
-        react_plan = await self.aexecute_tool_call(
-            formatted_response["action"], selected_tools
-        )
+        react_plan = await self.aexecute_tool_call(action, selected_tools)
 
         return react_plan
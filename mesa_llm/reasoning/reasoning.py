@@ -5,6 +5,8 @@ from typing import TYPE_CHECKING, Any
 if TYPE_CHECKING:
     from mesa_llm.llm_agent import LLMAgent
 
+EXECUTOR_SYSTEM_PROMPT = "You are an executor that executes the plan given to you in the prompt through tool calls."
+
 
 @dataclass
 class Observation:
@@ -77,11 +79,27 @@ class Reasoning(ABC):
         """
         return self.plan(prompt, obs, ttl, selected_tools)
 
+    def build_tool_call_request(self, chaining_message) -> list[dict]:
+        """
+        Prepare the chat messages of execute_tool_call() without sending them, so that
+        the tool call requests of several agents can be batched.
+        """
+        self.agent.llm.system_prompt = EXECUTOR_SYSTEM_PROMPT
+        return self.agent.llm.get_messages(chaining_message)
+
+    def complete_tool_call(self, rsp) -> Plan:
+        """
+        Turn the LLM response to a tool call request into a plan.
+        """
+        response_message = rsp.choices[0].message
+        plan = Plan(step=self.agent.model.steps, llm_plan=response_message, ttl=1)
+
+        return plan
+
     def execute_tool_call(
         self, chaining_message, selected_tools: list[str] | None = None
     ):
-        system_prompt = "You are an executor that executes the plan given to you in the prompt through tool calls."
-        self.agent.llm.system_prompt = system_prompt
+        self.agent.llm.system_prompt = EXECUTOR_SYSTEM_PROMPT
         rsp = self.agent.llm.generate(
             prompt=chaining_message,
             tool_schema=self.agent.tool_manager.get_all_tools_schema(
@@ -89,10 +107,8 @@ class Reasoning(ABC):
             ),
             tool_choice="required",
         )
-        response_message = rsp.choices[0].message
-        plan = Plan(step=self.agent.model.steps, llm_plan=response_message, ttl=1)
 
-        return plan
+        return self.complete_tool_call(rsp)
 
     async def aexecute_tool_call(
         self, chaining_message, selected_tools: list[str] | None = None
@@ -100,8 +116,7 @@ class Reasoning(ABC):
         """
         Asynchronous version of execute_tool_call() method.
         """
-        system_prompt = "You are an executor that executes the plan given to you in the prompt through tool calls."
-        self.agent.llm.system_prompt = system_prompt
+        self.agent.llm.system_prompt = EXECUTOR_SYSTEM_PROMPT
         rsp = await self.agent.llm.agenerate(
             prompt=chaining_message,
             tool_schema=self.agent.tool_manager.get_all_tools_schema(
@@ -109,7 +124,5 @@ class Reasoning(ABC):
             ),
             tool_choice="required",
         )
-        response_message = rsp.choices[0].message
-        plan = Plan(step=self.agent.model.steps, llm_plan=response_message, ttl=1)
 
-        return plan
+        return self.complete_tool_call(rsp)
@@ -2,6 +2,7 @@ import os
 from unittest.mock import patch
 
 import pytest
+from litellm.exceptions import RateLimitError
 
 from mesa_llm.module_llm import ModuleLLM
 
@@ -15,6 +16,13 @@ def _dummy_completion(**kwargs):
     return _DummyResponse({"choices": [{"message": {"content": "ok"}}]})
 
 
+def _dummy_batch_completion(**kwargs):
+    return [
+        _DummyResponse({"choices": [{"message": {"content": "ok"}}]})
+        for _ in kwargs["messages"]
+    ]
+
+
 async def _dummy_acompletion(**kwargs):
     return _DummyResponse({"choices": [{"message": {"content": "ok"}}]})
 
@@ -120,6 +128,76 @@ class TestModuleLLM:
         )
         assert response is not None
 
+    def test_generate_stream(self, monkeypatch):
+        # Record the arguments passed to litellm completion
+        calls = []
+
+        def _recording_completion(**kwargs):
+            calls.append(kwargs)
+            return iter(["o", "k"])
+
+        monkeypatch.setattr("mesa_llm.module_llm.completion", _recording_completion)
+        llm = ModuleLLM(llm_model="openai/gpt-4o")
+
+        chunks = llm.generate(prompt="Hello, how are you?", stream=True)
+        assert list(chunks) == ["o", "k"]
+        assert calls[-1]["stream"] is True
+
+        llm.generate(prompt="Hello, how are you?")
+        assert calls[-1]["stream"] is False
+
+    def test_batch_generate(self, monkeypatch):
+        # Prevent network calls by stubbing litellm batch_completion
+        monkeypatch.setattr(
+            "mesa_llm.module_llm.batch_completion", _dummy_batch_completion
+        )
+        llm = ModuleLLM(llm_model="openai/gpt-4o")
+        messages = [
+            llm.get_messages("Hello, how are you?"),
+            llm.get_messages("What is the weather in Tokyo?"),
+        ]
+        responses = llm.batch_generate(messages=messages)
+        assert len(responses) == 2
+
+        # Test that a failed request in the batch is raised
+        monkeypatch.setattr(
+            "mesa_llm.module_llm.batch_completion",
+            lambda **kwargs: [ValueError("bad request")],
+        )
+        with pytest.raises(ValueError, match="bad request"):
+            llm.batch_generate(messages=messages)
+
+    def test_batch_generate_retries_only_failed_requests(self, monkeypatch):
+        # First call: second request is rate limited, second call: it succeeds
+        calls = []
+
+        def _flaky_batch_completion(**kwargs):
+            calls.append(kwargs["messages"])
+            if len(calls) == 1:
+                return [
+                    _DummyResponse({"choices": [{"message": {"content": "first"}}]}),
+                    RateLimitError(
+                        message="slow down", llm_provider="openai", model="gpt-4o"
+                    ),
+                ]
+            return [_DummyResponse({"choices": [{"message": {"content": "second"}}]})]
+
+        monkeypatch.setattr(
+            "mesa_llm.module_llm.batch_completion", _flaky_batch_completion
+        )
+        llm = ModuleLLM(llm_model="openai/gpt-4o")
+        messages = [
+            llm.get_messages("Hello, how are you?"),
+            llm.get_messages("What is the weather in Tokyo?"),
+        ]
+
+        with patch("tenacity.nap.time.sleep"):
+            responses = llm.batch_generate(messages=messages)
+
+        assert calls == [messages, [messages[1]]]
+        assert responses[0]["choices"][0]["message"]["content"] == "first"
+        assert responses[1]["choices"][0]["message"]["content"] == "second"
+
     @pytest.mark.asyncio
     async def test_agenerate(self, monkeypatch):
         # Prevent network calls by stubbing litellm acompletion
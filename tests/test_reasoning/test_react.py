@@ -73,6 +73,57 @@ class TestReActReasoning:
         assert len(prompt_list) >= 1
         assert "last communication" not in prompt_list[-1]
 
+    def test_prepare_plan_prompt(self):
+        """Test prepare_plan_prompt builds the prompt without calling the LLM."""
+        mock_agent = Mock()
+        mock_agent.step_prompt = "Default step prompt"
+        mock_agent.memory = Mock()
+        mock_agent.memory.get_prompt_ready.return_value = ["memory1"]
+        mock_agent.memory.get_communication_history.return_value = ""
+        mock_agent.llm = Mock()
+
+        reasoning = ReActReasoning(mock_agent)
+        prompt_list = reasoning.prepare_plan_prompt(obs=None)
+
+        assert prompt_list == ["memory1", "Default step prompt"]
+        assert mock_agent.llm.system_prompt == reasoning.get_react_system_prompt()
+        mock_agent.llm.generate.assert_not_called()
+
+    def test_record_plan(self):
+        """Test record_plan stores the plan and returns its action."""
+        mock_agent = Mock()
+        mock_agent.memory = Mock()
+        mock_agent.memory.add_to_memory = Mock()
+
+        reasoning = ReActReasoning(mock_agent)
+        content = json.dumps({"reasoning": "Batched reasoning", "action": "speak"})
+
+        assert reasoning.record_plan(content) == "speak"
+        mock_agent.memory.add_to_memory.assert_called_once_with(
+            type="plan",
+            content={"reasoning": "Batched reasoning", "action": "speak"},
+        )
+
+    def test_complete_plan(self):
+        """Test complete_plan turns the response content into a plan."""
+        mock_agent = Mock()
+        mock_agent.memory = Mock()
+        mock_agent.memory.add_to_memory = Mock()
+
+        mock_plan = Plan(step=1, llm_plan=Mock())
+        reasoning = ReActReasoning(mock_agent)
+        reasoning.execute_tool_call = Mock(return_value=mock_plan)
+
+        content = json.dumps({"reasoning": "Batched reasoning", "action": "speak"})
+        result = reasoning.complete_plan(content, ["speak_to"])
+
+        assert result == mock_plan
+        mock_agent.memory.add_to_memory.assert_called_once_with(
+            type="plan",
+            content={"reasoning": "Batched reasoning", "action": "speak"},
+        )
+        reasoning.execute_tool_call.assert_called_once_with("speak", ["speak_to"])
+
     def test_plan_with_prompt(self):
         """Test plan method with custom prompt."""
         mock_agent = Mock()
@@ -88,3 +88,31 @@ class TestReasoningBase:
         assert isinstance(result_plan, Plan)
         assert result_plan.step == 5
         assert result_plan.llm_plan == "Final LLM message"
+
+    def test_build_and_complete_tool_call(self):
+        """Test that a tool call request can be built and completed separately."""
+        mock_agent = Mock()
+        mock_agent.model.steps = 2
+        mock_agent.llm.get_messages.return_value = [{"role": "user"}]
+
+        class ConcreteReasoning(Reasoning):
+            def plan(self, prompt, obs=None, ttl=1, selected_tools=None):
+                pass  # Not needed for this test
+
+        reasoning = ConcreteReasoning(agent=mock_agent)
+
+        messages = reasoning.build_tool_call_request("Execute the plan.")
+
+        assert messages == [{"role": "user"}]
+        assert "executor" in mock_agent.llm.system_prompt
+        mock_agent.llm.get_messages.assert_called_once_with("Execute the plan.")
+        mock_agent.llm.generate.assert_not_called()
+
+        mock_llm_response = Mock()
+        mock_llm_response.choices = [Mock()]
+        mock_llm_response.choices[0].message = "Batched LLM message"
+        result_plan = reasoning.complete_tool_call(mock_llm_response)
+
+        assert isinstance(result_plan, Plan)
+        assert result_plan.step == 2
+        assert result_plan.llm_plan == "Batched LLM message"